@@ -1,39 +1,104 @@
 import asyncio
 import os
 from datetime import datetime
-import requests
 
 from fastapi import FastAPI, Request, Form, Path
 from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse, FileResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
 
 # Importing your custom modules
 from db import (
     get_all_news, init_db, get_news_by_id, insert_news, 
     update_news, delete_news, get_all_db, 
-    get_all_news_by_category, get_prev_news, get_next_news
+    get_all_news_by_category, get_prev_news, get_next_news,
+    advisory_lock, close_pool, get_categories, on_news_write,
+    wait_for_write_hooks
 )
+from compression import CompressionMiddleware
+from assets import PrecompressedStaticFiles, static_url, load_manifest, precompress
+from uptime import UptimeMonitor
+from export import enable_from_env as enable_static_export
+from feeds import FeedStore
+from popularity import PopularityTracker
 
 app = FastAPI()
 
 # Setup templates and static files
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["static_url"] = static_url
 
 # Ensure static directory exists to avoid startup errors
 if not os.path.exists("static"):
     os.makedirs("static")
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# 静态文件：指纹 URL 长缓存 + 预压缩 .br/.gz（由 `python assets.py` 构建时生成）
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
+
+# 动态响应（HTML / JSON / sitemap）超过 1KB 时按 Accept-Encoding 压缩
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
 
 SITEMAP_PATH = "sitemap.xml"
 
+# 阅读量 / 热门榜：文章页只在内存计数，后台定期批量写入（见 popularity.py）
+popularity = PopularityTracker()
+
+# 静态导出：设置 STATIC_EXPORT_DIR 后，每次写入新闻只重建受影响的静态页面（见 export.py）
+static_exporter = enable_static_export(templates.env, popularity)
+
+# 订阅源：写入新闻时重新生成，平时直接返回预先序列化 + 预压缩的内容（见 feeds.py）
+feed_store = FeedStore()
+on_news_write(feed_store.on_write)
+
 # -------------------------- 启动事件 --------------------------
+# 生产环境由 gunicorn master 在 fork worker 之前调用 bootstrap()（见 gunicorn.conf.py），
+# worker 继承 BOOTSTRAPPED=True，启动时只做各自的预热。
+BOOTSTRAPPED = False
+
+def bootstrap():
+    """一次性启动工作：建表、生成 sitemap、预压缩静态文件"""
+    global BOOTSTRAPPED
+    # 多实例同时部署时用数据库锁串行化；拿不到锁也继续，以下操作都是幂等的
+    with advisory_lock("mychinesenews_bootstrap", timeout=120) as acquired:
+        if not acquired:
+            print("⚠️ 等待启动锁超时，继续执行")
+        init_db()
+        init_sitemap()
+        precompress()
+        feed_store.rebuild(get_categories())
+    BOOTSTRAPPED = True
+
+def warm_up():
+    """每个 worker 接流量前预热：静态资源指纹、模板编译、数据库连接"""
+    load_manifest()
+    for name in templates.env.list_templates():
+        templates.env.get_template(name)
+    try:
+        get_all_news()  # 建立连接池并预热首页查询
+        popularity.refresh()
+    except Exception as e:
+        print(f"预热数据库失败: {e}")
+
 @app.on_event("startup")
 async def startup_event():
-    init_db()
-    init_sitemap()
+    if not BOOTSTRAPPED:
+        # 单进程运行（uvicorn app:app / python app.py）时自己完成一次性工作
+        bootstrap()
+    warm_up()
     # Start background tasks
-    asyncio.create_task(periodic_keep_alive(300))
+    app.state.background_tasks = [
+        asyncio.create_task(uptime_monitor.run()),
+        asyncio.create_task(popularity.run()),
+    ]
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """收到 SIGTERM 后，uvicorn 处理完进行中的请求才会走到这里"""
+    tasks = getattr(app.state, "background_tasks", [])
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.to_thread(popularity.flush)  # 写入还在缓冲区里的阅读量
+    await asyncio.to_thread(wait_for_write_hooks, 30)  # 等排队中的静态页 / 订阅源重建完成
+    close_pool()
 
 # -------------------------- Sitemap Logic --------------------------
 def init_sitemap():
@@ -73,24 +138,34 @@ def init_sitemap():
 async def sitemap_xml():
     return FileResponse(SITEMAP_PATH, media_type="application/xml")
 
-# -------------------------- Background Tasks --------------------------
+# -------------------------- 订阅源 --------------------------
+@app.get("/feed.xml")
+async def feed_rss(request: Request):
+    return await feed_store.response(request, "all", "rss")
 
-KEEP_ALIVE_URLS = [
-    "https://globalinternationalnews.onrender.com/",
-    "https://globalnews-5ose.onrender.com/",
-    "https://www.mychinesenews.my",
-    "https://allmychinesenews.onrender.com/"
-]
-
-async def periodic_keep_alive(interval=300):
-    while True:
-        for url in KEEP_ALIVE_URLS:
-            try:
-                await asyncio.get_event_loop().run_in_executor(None, lambda u=url: requests.get(u, timeout=30))
-                print(f"[{datetime.now()}] keep-alive 成功: {url}")
-            except Exception as e:
-                print(f"[{datetime.now()}] keep-alive 失败: {url} 错误: {e}")
-        await asyncio.sleep(interval)
+@app.get("/atom.xml")
+async def feed_atom(request: Request):
+    return await feed_store.response(request, "all", "atom")
+
+@app.get("/feed.json")
+async def feed_json(request: Request):
+    return await feed_store.response(request, "all", "json")
+
+@app.get("/category/{category}/feed.xml")
+async def category_feed_rss(request: Request, category: str = Path(...)):
+    return await feed_store.response(request, category, "rss")
+
+@app.get("/category/{category}/atom.xml")
+async def category_feed_atom(request: Request, category: str = Path(...)):
+    return await feed_store.response(request, category, "atom")
+
+@app.get("/category/{category}/feed.json")
+async def category_feed_json(request: Request, category: str = Path(...)):
+    return await feed_store.response(request, category, "json")
+
+# -------------------------- Background Tasks --------------------------
+# 在线监控（原 keep-alive）：目标通过环境变量 UPTIME_TARGETS 配置，见 uptime.py
+uptime_monitor = UptimeMonitor.from_env()
 
 # -------------------------- 核心路由 (Main Routes) --------------------------
 @app.get("/")
@@ -99,7 +174,7 @@ async def home(request: Request):
     return templates.TemplateResponse(
         request=request,
         name="main.html",
-        context={"news": news, "year": datetime.now().year}
+        context={"news": news, "hot_news": popularity.top("all"), "year": datetime.now().year}
     )
 
 @app.get("/category/{category}", response_class=HTMLResponse)
@@ -108,12 +183,19 @@ async def category_page(request: Request, category: str = Path(...)):
     return templates.TemplateResponse(
         request=request,
         name="category.html",
-        context={"news": news, "category": category, "year": datetime.now().year}
+        context={
+            "news": news,
+            "hot_news": popularity.top(category, 5),
+            "category": category,
+            "year": datetime.now().year
+        }
     )
     
 @app.get("/news/{news_id}")
 async def news_detail(request: Request, news_id: int):
     news_item = get_news_by_id(news_id)
+    if news_item:
+        popularity.record_view(news_id)
     return templates.TemplateResponse(
     request=request,
     name="detail.html",
@@ -132,6 +214,10 @@ async def api_news(category: str = "all", skip: int = 0, limit: int = 20):
         news = get_all_news_by_category(category, skip=skip, limit=limit)
     return {"news": news}
 
+@app.get("/api/uptime", response_class=JSONResponse)
+async def api_uptime():
+    return uptime_monitor.snapshot()
+
 # -------------------------- 静态信息页 --------------------------
 @app.get("/about", response_class=HTMLResponse)
 async def about(request: Request):
@@ -231,5 +317,6 @@ def append_news_to_sitemap(news_id: int):
 # -------------------------- Server Start --------------------------
 if __name__ == "__main__":
     import uvicorn
+    # 本地开发用；生产环境请用 gunicorn -c gunicorn.conf.py app:app（见 Procfile）
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run("app:app", host="0.0.0.0", port=port, reload=True)
+    uvicorn.run("app:app", host="0.0.0.0", port=port, reload=os.environ.get("RELOAD", "1") == "1")
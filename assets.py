@@ -0,0 +1,168 @@
+"""
+静态资源：内容指纹 URL + 构建期预压缩。
+
+- 模板里用 {{ static_url('detail.css') }} 得到 /static/detail.<hash>.css，
+  内容一变 URL 就变，所以可以 immutable 缓存一年
+- python assets.py 在构建时为 static/ 下可压缩的文件生成 .br / .gz，
+  PrecompressedStaticFiles 按 Accept-Encoding 直接返回预压缩版本
+"""
+import hashlib
+import mimetypes
+import os
+import re
+
+from starlette.datastructures import Headers
+from starlette.staticfiles import StaticFiles
+
+from compression import brotli, choose_encoding, compress, is_compressible, add_vary, write_atomic
+
+STATIC_DIR = "static"
+STATIC_PREFIX = "/static"
+HASH_LEN = 8
+
+# 预压缩文件后缀（按优先级）
+PRECOMPRESSED = {"br": ".br", "gzip": ".gz"}
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_DEFAULT = "public, max-age=3600"
+
+FINGERPRINT_RE = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[A-Za-z0-9]+)$" % HASH_LEN)
+
+# 相对路径 → 内容哈希
+_manifest = {}
+
+
+# -------------------- 指纹 --------------------
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:HASH_LEN]
+
+
+def is_variant(name):
+    return name.endswith(tuple(PRECOMPRESSED.values()))
+
+
+def load_manifest(directory=STATIC_DIR):
+    """扫描 static/，计算每个文件的内容哈希"""
+    global _manifest
+    manifest = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if is_variant(name):
+                continue
+            full_path = os.path.join(root, name)
+            rel = os.path.relpath(full_path, directory).replace(os.sep, "/")
+            manifest[rel] = file_hash(full_path)
+    _manifest = manifest
+    return manifest
+
+
+def static_url(name, directory=STATIC_DIR):
+    """模板辅助函数：返回带内容指纹的静态资源 URL"""
+    digest = _manifest.get(name)
+    if digest is None:
+        full_path = os.path.join(directory, name)
+        if not os.path.isfile(full_path):
+            return f"{STATIC_PREFIX}/{name}"
+        digest = _manifest[name] = file_hash(full_path)
+    stem, ext = os.path.splitext(name)
+    return f"{STATIC_PREFIX}/{stem}.{digest}{ext}"
+
+
+# -------------------- 预压缩（构建期） --------------------
+def remove_stale_variants(source):
+    """删除比原文件旧的 .br / .gz"""
+    for suffix in PRECOMPRESSED.values():
+        target = source + suffix
+        if os.path.exists(target) and os.path.getmtime(target) < os.path.getmtime(source):
+            os.remove(target)
+
+
+def precompress(directory=STATIC_DIR, min_size=256):
+    """为可压缩文件生成 .br / .gz；压缩后不变小的跳过，已是最新的不重复生成"""
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if is_variant(name):
+                continue
+            source = os.path.join(root, name)
+            content_type, _ = mimetypes.guess_type(source)
+            if not content_type or not is_compressible(content_type):
+                continue
+            if os.path.getsize(source) < min_size:
+                remove_stale_variants(source)
+                continue
+
+            with open(source, "rb") as f:
+                data = f.read()
+            for encoding, suffix in PRECOMPRESSED.items():
+                target = source + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+                    continue
+                packed = None
+                if encoding != "br" or brotli is not None:
+                    packed = compress(data, encoding, gzip_level=9, brotli_quality=11)
+                if packed is None or len(packed) >= len(data):
+                    # 不生成时也要删掉旧版本，否则 PrecompressedStaticFiles 会返回过期内容
+                    if os.path.exists(target):
+                        os.remove(target)
+                    continue
+                write_atomic(target, packed)
+                written += 1
+    return written
+
+
+# -------------------- 静态文件服务 --------------------
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    在 StaticFiles 基础上：
+    1. 识别 name.<hash>.ext 形式的指纹 URL，哈希匹配时按 immutable 缓存
+    2. 客户端接受 br / gzip 且存在预压缩文件时，直接返回预压缩版本
+    """
+
+    async def get_response(self, path, scope):
+        fingerprinted = False
+        m = FINGERPRINT_RE.match(path)
+        if m:
+            original = m["stem"] + m["ext"]
+            _, stat_result = self.lookup_path(original)
+            if stat_result is not None:
+                # 哈希过期时仍返回当前内容，但不能标记为 immutable
+                fingerprinted = _manifest.get(original.replace(os.sep, "/")) == m["hash"]
+                path = original
+
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response = self.precompressed_response(path, scope, response)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = CACHE_IMMUTABLE if fingerprinted else CACHE_DEFAULT
+        return response
+
+    def precompressed_response(self, path, scope, response):
+        content_type = response.headers.get("content-type", "")
+        if not is_compressible(content_type):
+            return response
+        add_vary(response.headers)
+
+        available = {}
+        for encoding, suffix in PRECOMPRESSED.items():
+            full_path, stat_result = self.lookup_path(path + suffix)
+            if stat_result is not None:
+                available[encoding] = (full_path, stat_result)
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), tuple(available))
+        if encoding is None:
+            return response
+
+        full_path, stat_result = available[encoding]
+        variant = self.file_response(full_path, stat_result, scope)
+        variant.headers["Vary"] = "Accept-Encoding"
+        if variant.status_code == 200:
+            variant.headers["Content-Type"] = content_type
+            variant.headers["Content-Encoding"] = encoding
+        return variant
+
+
+if __name__ == "__main__":
+    manifest = load_manifest()
+    count = precompress()
+    print(f"✅ 静态资源 {len(manifest)} 个，生成预压缩文件 {count} 个")
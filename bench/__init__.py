@@ -0,0 +1 @@
+"""性能基准测试套件：合成语料 + HTTP 压测 + 微基准，结果写入 JSON 便于跨提交对比"""
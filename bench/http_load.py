@@ -0,0 +1,143 @@
+"""
+HTTP 压测场景：对主要页面 / API 发并发请求，统计吞吐量与 p50/p95/p99 延迟。
+
+既可以压测进程内启动的 app（配合 SQLite 替身），也可以用 --url 压测已部署的实例。
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+
+from bench.corpus import CATEGORIES
+
+
+# -------------------- 场景定义 --------------------
+def build_scenarios(ids, deep_skip):
+    """每个场景是 (名称, 生成请求路径的函数)；函数接收一个 random.Random"""
+    return [
+        ("home", lambda rng: "/"),
+        ("category", lambda rng: f"/category/{quote(rng.choice(CATEGORIES))}"),
+        ("detail", lambda rng: f"/news/{rng.choice(ids)}"),
+        ("api_news_shallow", lambda rng: "/api/news?category=all&skip=0&limit=20"),
+        ("api_news_deep", lambda rng: f"/api/news?category=all&skip={deep_skip}&limit=20"),
+        ("sitemap", lambda rng: "/sitemap.xml"),
+    ]
+
+
+# -------------------- 统计 --------------------
+def percentile(sorted_values, p):
+    """最近秩法求百分位，输入必须已排序"""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def summarize(latencies, errors, wall, total_bytes):
+    lat = sorted(latencies)
+    ok = len(lat)
+    return {
+        "requests": ok + errors,
+        "errors": errors,
+        "wall_s": round(wall, 4),
+        "throughput_rps": round(ok / wall, 2) if wall > 0 else None,
+        "bytes_per_request": round(total_bytes / ok) if ok else None,
+        "p50_ms": round(percentile(lat, 50) * 1000, 3) if ok else None,
+        "p95_ms": round(percentile(lat, 95) * 1000, 3) if ok else None,
+        "p99_ms": round(percentile(lat, 99) * 1000, 3) if ok else None,
+        "max_ms": round(lat[-1] * 1000, 3) if ok else None,
+    }
+
+
+# -------------------- 压测执行 --------------------
+_local = threading.local()
+
+
+def _session():
+    # 每个线程一个 Session，复用 keep-alive 连接
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _hit(base_url, path, headers):
+    start = time.perf_counter()
+    resp = _session().get(base_url + path, headers=headers, timeout=30)
+    elapsed = time.perf_counter() - start
+    # 优先用 Content-Length 统计线上传输字节（压缩后），resp.content 是解压后的
+    size = int(resp.headers.get("content-length", len(resp.content)))
+    return resp.status_code, elapsed, size
+
+
+def run_scenario(base_url, make_path, requests_n=300, concurrency=8, warmup=20, seed=0, headers=None):
+    rng = random.Random(seed)
+    paths = [make_path(rng) for _ in range(warmup + requests_n)]
+
+    latencies, errors, total_bytes = [], 0, 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # 预热：填充模板缓存 / 建立连接，不计入结果
+        list(pool.map(lambda p: _hit(base_url, p, headers), paths[:warmup]))
+
+        start = time.perf_counter()
+        futures = [pool.submit(_hit, base_url, p, headers) for p in paths[warmup:]]
+        for f in futures:
+            try:
+                status, elapsed, size = f.result()
+            except Exception:
+                errors += 1
+                continue
+            if status >= 400:
+                errors += 1
+                continue
+            latencies.append(elapsed)
+            total_bytes += size
+        wall = time.perf_counter() - start
+
+    return summarize(latencies, errors, wall, total_bytes)
+
+
+def run_all(base_url, ids, deep_skip, requests_n=300, concurrency=8, warmup=20, seed=0, headers=None):
+    results = {}
+    for name, make_path in build_scenarios(ids, deep_skip):
+        result = run_scenario(base_url, make_path, requests_n, concurrency, warmup, seed, headers)
+        results[name] = result
+        print(
+            f"  {name:<18} {result['throughput_rps']} req/s  "
+            f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms  "
+            f"errors={result['errors']}"
+        )
+    return results
+
+
+def discover_ids(base_url, limit=200):
+    """从 /api/news 取一批真实 id，用于详情页场景"""
+    resp = requests.get(f"{base_url}/api/news?category=all&skip=0&limit={limit}", timeout=30)
+    resp.raise_for_status()
+    return [item["id"] for item in resp.json()["news"]]
+
+
+# -------------------- 进程内启动 app --------------------
+class InProcessServer:
+    """在后台线程里跑 uvicorn，压测结束后关闭"""
+
+    def __init__(self, app, host="127.0.0.1", port=8765):
+        import uvicorn
+
+        self.url = f"http://{host}:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("app 启动失败，见上方日志")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
@@ -0,0 +1,60 @@
+"""
+微基准：harvest.py 的 HTML 解析（离线 fixture）与文本后处理函数。
+"""
+import os
+import random
+import statistics
+import timeit
+
+from harvest import parse_article_content, parse_article_image, add_linebreaks, dedup_sentences
+from bench.corpus import make_content
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# fixture 文件 → 解析时使用的原文链接（决定走哪个站点的 selector）
+FIXTURES = {
+    "udn": ("udn.html", "https://udn.com/news/story/6809/0000001"),
+    "ltn": ("ltn.html", "https://news.ltn.com.tw/news/world/breakingnews/0000001"),
+    "yahoo": ("yahoo.html", "https://tw.news.yahoo.com/sample-000000001.html"),
+}
+
+
+def load_fixture(name):
+    filename, link = FIXTURES[name]
+    with open(os.path.join(FIXTURE_DIR, filename), "r", encoding="utf-8") as f:
+        return f.read(), link
+
+
+def measure(fn, number=50, repeat=5):
+    """返回每次调用耗时（微秒）的最小值 / 中位数"""
+    timings = timeit.Timer(fn).repeat(repeat=repeat, number=number)
+    per_call = [t / number * 1e6 for t in timings]
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+    }
+
+
+def run_all(number=50, repeat=5, seed=0):
+    results = {}
+
+    for name in FIXTURES:
+        html, link = load_fixture(name)
+        results[f"parse_article_content[{name}]"] = measure(
+            lambda: parse_article_content(html, link), number, repeat
+        )
+        results[f"parse_article_image[{name}]"] = measure(
+            lambda: parse_article_image(html, link), number, repeat
+        )
+
+    # 长文本：约等于一篇改写后的正文
+    rng = random.Random(seed)
+    text = "".join(make_content(rng, 10, 20) for _ in range(3))
+    results["add_linebreaks"] = measure(lambda: add_linebreaks(text), number * 10, repeat)
+    results["dedup_sentences"] = measure(lambda: dedup_sentences(text), number * 10, repeat)
+
+    for key, r in results.items():
+        print(f"  {key:<34} min={r['min_us']}µs median={r['median_us']}µs")
+    return results
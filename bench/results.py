@@ -0,0 +1,84 @@
+"""
+基准结果读写：每次运行写一个 JSON（带 git 提交号），并支持两次结果对比。
+
+对比用法：
+    python -m bench.results bench/results/旧.json bench/results/新.json
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def git_revision():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def write_results(results, params, out_dir=RESULTS_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    revision = git_revision()
+    now = datetime.now()
+    payload = {
+        "meta": {
+            "git": revision,
+            "timestamp": now.isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "params": params,
+        },
+        **results,
+    }
+    path = os.path.join(out_dir, f"{now.strftime('%Y%m%d-%H%M%S')}-{revision}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# -------------------- 对比 --------------------
+# 每组结果里用来对比的指标（越小越好的标 True）
+COMPARE_METRICS = {
+    "http": [("throughput_rps", False), ("p50_ms", True), ("p95_ms", True), ("p99_ms", True)],
+    "micro": [("median_us", True)],
+}
+
+
+def compare(old, new):
+    rows = []
+    for group, metrics in COMPARE_METRICS.items():
+        for name in sorted(set(old.get(group, {})) & set(new.get(group, {}))):
+            for metric, lower_is_better in metrics:
+                a = old[group][name].get(metric)
+                b = new[group][name].get(metric)
+                if not a or b is None:
+                    continue
+                change = (b - a) / a * 100
+                better = change < 0 if lower_is_better else change > 0
+                rows.append((f"{group}.{name}.{metric}", a, b, change, better))
+    return rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("用法: python -m bench.results OLD.json NEW.json")
+        sys.exit(1)
+    old, new = load_results(sys.argv[1]), load_results(sys.argv[2])
+    print(f"{old['meta']['git']} → {new['meta']['git']}")
+    for key, a, b, change, better in compare(old, new):
+        mark = "✅" if better else "⚠️"
+        print(f"{mark} {key:<50} {a:>12} → {b:<12} ({change:+.1f}%)")
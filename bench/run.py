@@ -0,0 +1,79 @@
+"""
+基准测试入口。
+
+    # 进程内启动 app + SQLite 替身 + 合成语料，跑全部基准
+    python -m bench.run --articles 2000 --requests 300 --concurrency 8
+
+    # 只压测已部署的实例
+    python -m bench.run --url https://www.mychinesenews.my --only http
+
+需要在仓库根目录运行（app.py 用相对路径找 templates / static）。
+"""
+import argparse
+import os
+import tempfile
+
+from bench import http_load, micro, results
+
+
+def run_http(args):
+    if args.url:
+        base_url = args.url.rstrip("/")
+        ids = http_load.discover_ids(base_url)
+        print(f"🌍 压测 {base_url}（{len(ids)} 个详情页 id）")
+        return http_load.run_all(
+            base_url, ids, args.deep_skip or 1000,
+            args.requests, args.concurrency, args.warmup, args.seed,
+        )
+
+    from bench import standin, corpus
+
+    # 基准期间不探测外网
+    os.environ["UPTIME_TARGETS"] = ""
+    standin.install()
+    ids = corpus.seed(args.articles, seed=args.seed)
+    print(f"📦 已生成 {len(ids)} 篇合成文章")
+
+    import app as app_module
+
+    # 基准期间不覆盖真实的 sitemap
+    app_module.SITEMAP_PATH = os.path.join(tempfile.mkdtemp(), "sitemap.xml")
+
+    with http_load.InProcessServer(app_module.app, port=args.port) as server:
+        print(f"🚀 进程内压测 {server.url}")
+        return http_load.run_all(
+            server.url, ids, args.deep_skip or int(len(ids) * 0.9),
+            args.requests, args.concurrency, args.warmup, args.seed,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="性能基准测试")
+    parser.add_argument("--only", choices=["http", "micro"], help="只跑其中一组")
+    parser.add_argument("--url", help="压测已有实例，不启动本地 app")
+    parser.add_argument("--articles", type=int, default=2000, help="合成文章数量")
+    parser.add_argument("--requests", type=int, default=300, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--deep-skip", type=int, help="/api/news 深分页的 skip，默认取语料的 90%%")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--number", type=int, default=50, help="微基准每轮调用次数")
+    parser.add_argument("--repeat", type=int, default=5, help="微基准轮数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=results.RESULTS_DIR)
+    args = parser.parse_args()
+
+    output = {}
+    if args.only in (None, "http"):
+        print("\n== HTTP 场景 ==")
+        output["http"] = run_http(args)
+    if args.only in (None, "micro"):
+        print("\n== 微基准 ==")
+        output["micro"] = micro.run_all(args.number, args.repeat, args.seed)
+
+    path = results.write_results(output, vars(args), args.out)
+    print(f"\n📊 结果已写入 {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+本地数据库替身：用 SQLite 模拟 db.py 依赖的 MySQL 连接池。
+
+只在基准测试里使用 —— install() 会把 db._pool 换成替身，
+之后 db.py 里的所有函数（insert_news / get_all_news ...）原样运行。
+"""
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+import db
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT UNIQUE,
+    content TEXT,
+    image_url TEXT,
+    category VARCHAR(100) DEFAULT 'all',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS news_stats (
+    news_id INTEGER NOT NULL,
+    bucket DATETIME NOT NULL,
+    views INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (news_id, bucket)
+);
+CREATE INDEX IF NOT EXISTS idx_bucket ON news_stats (bucket);
+"""
+
+sqlite3.register_adapter(datetime, lambda dt: dt.strftime("%Y-%m-%d %H:%M:%S"))
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.fromisoformat(b.decode()))
+sqlite3.register_converter("DATETIME", lambda b: datetime.fromisoformat(b.decode()))
+
+
+# -------------------- MySQL 方言 → SQLite --------------------
+def translate(query):
+    """把 db.py 里的 MySQL 语句改写成 SQLite 可执行的形式；返回 None 表示直接忽略"""
+    q = query.strip().rstrip(";")
+    upper = q.upper()
+
+    # 时区设置、建表由替身自己负责
+    if upper.startswith("SET ") or upper.startswith("CREATE TABLE"):
+        return None
+    # 单进程基准里不需要跨进程锁
+    if "GET_LOCK(" in upper or "RELEASE_LOCK(" in upper:
+        return "SELECT 1"
+    if upper.startswith("DESCRIBE "):
+        table = q.split()[1]
+        return f"SELECT name FROM pragma_table_info('{table}')"
+
+    # 与 insert_news 的约定一致：被忽略的重复插入返回 0
+    q = q.replace(
+        "LAST_INSERT_ID()",
+        "CASE WHEN changes() > 0 THEN last_insert_rowid() ELSE 0 END",
+    )
+    m = re.search(r"\s+ON DUPLICATE KEY UPDATE\s+(.*)$", q, flags=re.S | re.I)
+    if m:
+        assignments = m.group(1).strip()
+        q = q[:m.start()]
+        if re.fullmatch(r"(\w+)\s*=\s*\1", assignments):
+            # insert_news 的 "title=title" 只是忽略重复
+            q = re.sub(r"^INSERT\s+INTO", "INSERT OR IGNORE INTO", q, flags=re.I)
+        else:
+            assignments = re.sub(r"VALUES\((\w+)\)", r"excluded.\1", assignments, flags=re.I)
+            q = f"{q} ON CONFLICT DO UPDATE SET {assignments}"
+    return q.replace("%s", "?")
+
+
+# -------------------- 连接池接口 --------------------
+class StandInCursor:
+    def __init__(self, conn):
+        self._cur = conn.cursor()
+        self._skipped = False
+
+    def execute(self, query, params=()):
+        sql = translate(query)
+        self._skipped = sql is None
+        if not self._skipped:
+            # 被整体替换掉的语句（如 GET_LOCK）不再需要参数
+            self._cur.execute(sql, tuple(params) if "?" in sql else ())
+
+    def fetchone(self):
+        return None if self._skipped else self._cur.fetchone()
+
+    def fetchall(self):
+        return [] if self._skipped else self._cur.fetchall()
+
+    def close(self):
+        self._cur.close()
+
+
+class StandInConnection:
+    def __init__(self, pool):
+        self._pool = pool
+
+    def cursor(self):
+        return StandInCursor(self._pool.conn)
+
+    def commit(self):
+        self._pool.conn.commit()
+
+    def rollback(self):
+        self._pool.conn.rollback()
+
+    def close(self):
+        """和 MySQL 连接池一样：close() 只是归还连接"""
+        self._pool.release()
+
+
+class StandInPool:
+    """与线上一致：整个池只有 1 个连接，同一时刻只有一个调用方能拿到"""
+
+    def __init__(self, path=":memory:"):
+        self.conn = sqlite3.connect(
+            path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False
+        )
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    def get_connection(self):
+        self._lock.acquire()
+        return StandInConnection(self)
+
+    def release(self):
+        self._lock.release()
+
+    def _remove_connections(self):
+        """db.close_pool() 会调用；替身的数据留到进程结束，便于关闭 app 后继续读取"""
+
+
+def install(path=":memory:"):
+    """用 SQLite 替身替换 db.py 的连接池（以及池外的独立连接）"""
+    db._pool = StandInPool(path)
+    db.connect = db._pool.get_connection
+    return db._pool
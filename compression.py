@@ -0,0 +1,192 @@
+"""
+响应压缩：按 Accept-Encoding 协商 br / gzip。
+
+- choose_encoding(): 解析 Accept-Encoding，选出客户端能接受的最佳编码
+- CompressionMiddleware: 纯 ASGI 中间件，压缩超过阈值的 HTML / JSON / XML 等动态响应
+- write_precompressed(): 写文件并生成 .gz / .br 预压缩版本（静态导出、订阅源共用）
+"""
+import gzip
+import os
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # 没装 brotli 时只用 gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/xml",
+    "application/javascript",
+    "application/rss+xml",
+    "application/atom+xml",
+    "application/feed+json",
+    "image/svg+xml",
+)
+
+# 动态压缩可用的编码（按优先级）
+DYNAMIC_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+# -------------------- 编码协商 --------------------
+def parse_accept_encoding(value: str) -> dict:
+    """'br;q=1.0, gzip;q=0.8, *;q=0' → {'br': 1.0, 'gzip': 0.8, '*': 0.0}"""
+    accepted = {}
+    for part in value.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: str, available=DYNAMIC_ENCODINGS):
+    """从 available 里按优先级选第一个客户端接受的编码，都不接受则返回 None"""
+    accepted = parse_accept_encoding(accept_encoding or "")
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level=6, brotli_quality=5) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+# -------------------- 预压缩文件 --------------------
+PRECOMPRESSED_SUFFIXES = (".br", ".gz")
+
+
+def write_atomic(path, data: bytes):
+    """先写临时文件再替换，读取方（nginx / 其他 worker）不会读到写了一半的文件"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_precompressed(path, data: bytes, precompress=True, gzip_level=9, brotli_quality=11) -> bool:
+    """
+    写入 path 及其 .br / .gz 版本。先写压缩版本、最后替换原文：读到新 mtime 时压缩版本一定已是新的。
+    内容没变时不重写，mtime（Last-Modified）保持不变；返回是否写入。
+    """
+    suffixes = ()
+    if precompress:
+        suffixes = PRECOMPRESSED_SUFFIXES if brotli is not None else (".gz",)
+    try:
+        with open(path, "rb") as f:
+            unchanged = f.read() == data
+    except FileNotFoundError:
+        unchanged = False
+    if unchanged and all(os.path.exists(path + suffix) == (suffix in suffixes) for suffix in PRECOMPRESSED_SUFFIXES):
+        return False
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    for suffix in PRECOMPRESSED_SUFFIXES:
+        if suffix in suffixes:
+            encoding = "br" if suffix == ".br" else "gzip"
+            write_atomic(path + suffix, compress(data, encoding, gzip_level, brotli_quality))
+        elif os.path.exists(path + suffix):
+            os.remove(path + suffix)  # 不再预压缩时删掉旧版本，避免 gzip_static 返回过期内容
+    write_atomic(path, data)
+    return True
+
+
+def remove_precompressed(path):
+    """删除 path 及其预压缩版本"""
+    for suffix in ("", *PRECOMPRESSED_SUFFIXES):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.split(";")[0].strip().lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def add_vary(headers: MutableHeaders):
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+# -------------------- 中间件 --------------------
+class CompressionMiddleware:
+    """
+    整体缓冲响应体后一次性压缩。本站页面都是模板一次渲染完成的，
+    缓冲不会增加首字节延迟；已带 Content-Encoding 的响应（如预压缩静态文件）原样透传。
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=5, exclude_prefixes=("/static",)):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_prefixes = tuple(exclude_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+        chunks = []
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                passthrough = (
+                    "content-encoding" in headers
+                    or not is_compressible(headers.get("content-type", ""))
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=list(start_message["headers"]))
+            add_vary(headers)
+            if len(body) >= self.minimum_size:
+                body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                # 压缩后字节不同，强 ETag 需降级为弱 ETag
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+            start_message["headers"] = headers.raw
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,180 @@
+"""
+静态导出：把首页、分类页、文章页和信息页渲染成静态 HTML，可直接交给 nginx / CDN。
+
+    python export.py                  # 全量导出到 STATIC_EXPORT_DIR（默认 public/）
+    python export.py --news 12 15     # 只重建指定文章（以及首页和相关分类页）
+
+设置环境变量 STATIC_EXPORT_DIR 后，app 和 harvest.py 都会注册写入钩子：insert_news /
+update_news / delete_news 之后在后台线程里只重建受影响的页面。/api、/admin 等仍由动态 app 提供。
+
+目录结构与 URL 一一对应，nginx 用 try_files $uri $uri/index.html @app 即可：
+    index.html
+    category/<分类>/index.html
+    news/<id>/index.html
+    about/index.html ...
+    static/<name>.<ext>、static/<name>.<hash>.<ext>（只有带指纹的可以 immutable 缓存）
+"""
+import argparse
+import os
+import shutil
+from datetime import datetime
+
+from jinja2 import Environment, FileSystemLoader
+
+from db import (
+    get_all_news, get_all_news_by_category, get_news_by_id,
+    get_categories, on_news_write
+)
+from assets import STATIC_DIR, load_manifest, static_url
+from compression import write_precompressed, remove_precompressed
+from popularity import PopularityTracker
+
+DEFAULT_EXPORT_DIR = "public"
+
+# 不依赖数据库的信息页：URL 路径 → (模板, 是否需要 year)
+INFO_PAGES = {
+    "about": ("about.html", False),
+    "contact": ("contact.html", False),
+    "privacy": ("privacy.html", False),
+    "terms": ("terms.html", True),
+    "disclaimer": ("disclaimer.html", True),
+}
+
+
+def default_env():
+    """与 app.py 里 Jinja2Templates 相同的配置（CLI 不需要导入整个 app）"""
+    env = Environment(loader=FileSystemLoader("templates"), autoescape=True)
+    env.globals["static_url"] = static_url
+    return env
+
+
+class StaticExporter:
+    def __init__(self, env=None, out_dir=DEFAULT_EXPORT_DIR, precompress=True, popularity=None):
+        self.env = env or default_env()
+        self.out_dir = out_dir
+        self.precompress = precompress
+        self.popularity = popularity or PopularityTracker()
+
+    # -------------------- 文件写入 --------------------
+    def _path(self, *parts):
+        return os.path.join(self.out_dir, *parts, "index.html")
+
+    def _write(self, path, html):
+        """原子写入 + 预压缩；内容没变的页面不重写，nginx / CDN 的 Last-Modified 保持不变"""
+        write_precompressed(path, html.encode("utf-8"), self.precompress)
+
+    def _remove(self, path):
+        remove_precompressed(path)
+
+    def _render(self, name, **context):
+        return self.env.get_template(name).render(**context)
+
+    def _refresh_hot_news(self):
+        """静态页上的“热门”只在导出 / 写入触发重建时刷新，不像动态页每 5 分钟更新"""
+        try:
+            self.popularity.refresh()
+        except Exception as e:
+            print(f"热门榜刷新失败: {e}")
+
+    # -------------------- 各类页面 --------------------
+    def render_home(self):
+        html = self._render("main.html", news=get_all_news(), hot_news=self.popularity.top("all"),
+                            year=datetime.now().year)
+        self._write(os.path.join(self.out_dir, "index.html"), html)
+
+    def render_category(self, category):
+        if "/" in category or category in (".", ".."):
+            return
+        news = get_all_news_by_category(category, skip=0, limit=20)
+        html = self._render("category.html", news=news, hot_news=self.popularity.top(category, 5),
+                            category=category, year=datetime.now().year)
+        self._write(self._path("category", category), html)
+
+    def render_detail(self, news_id, news_item=None):
+        news_item = news_item or get_news_by_id(news_id)
+        path = self._path("news", str(news_id))
+        if not news_item:
+            self._remove(path)
+            return
+        html = self._render("detail.html", news_item=news_item, year=datetime.now().year)
+        self._write(path, html)
+
+    def render_info_pages(self):
+        for url_path, (template, needs_year) in INFO_PAGES.items():
+            context = {"year": datetime.now().year} if needs_year else {}
+            self._write(self._path(url_path), self._render(template, **context))
+
+    def copy_static(self):
+        """复制 static/：原文件名和带指纹的文件名各一份，连同预压缩版本"""
+        manifest = load_manifest()
+        target_dir = os.path.join(self.out_dir, "static")
+        for rel, digest in manifest.items():
+            stem, ext = os.path.splitext(rel)
+            for name in (rel, f"{stem}.{digest}{ext}"):
+                for suffix in ("", ".gz", ".br"):
+                    source = os.path.join(STATIC_DIR, rel + suffix)
+                    if not os.path.exists(source):
+                        continue
+                    target = os.path.join(target_dir, name + suffix)
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.copy2(source, target)
+
+    # -------------------- 全量 / 增量 --------------------
+    def export_all(self, batch_size=500):
+        self._refresh_hot_news()
+        self.copy_static()
+        self.render_info_pages()
+        self.render_home()
+        for category in ["all", *get_categories()]:
+            self.render_category(category)
+
+        count, skip = 0, 0
+        while True:
+            batch = get_all_news(skip=skip, limit=batch_size)
+            for item in batch:
+                self.render_detail(item["id"], item)
+            count += len(batch)
+            if len(batch) < batch_size:
+                break
+            skip += batch_size
+        return count
+
+    def rebuild(self, news_ids, categories):
+        """只重建受影响的页面：文章本身、首页、相关分类页和“全部”分类页"""
+        self._refresh_hot_news()
+        for news_id in news_ids:
+            self.render_detail(news_id)
+        self.render_home()
+        for category in {"all", *categories}:
+            self.render_category(category)
+
+    def on_write(self, news_ids, categories):
+        """db.on_news_write 钩子（在写入钩子线程里执行）"""
+        self.rebuild(news_ids, categories)
+
+
+def enable_from_env(env=None, popularity=None):
+    """设置了 STATIC_EXPORT_DIR 时注册写入钩子，返回 exporter；否则返回 None"""
+    out_dir = os.environ.get("STATIC_EXPORT_DIR")
+    if not out_dir:
+        return None
+    exporter = StaticExporter(env, out_dir, popularity=popularity)
+    on_news_write(exporter.on_write)
+    return exporter
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="导出静态页面")
+    parser.add_argument("--out", default=os.environ.get("STATIC_EXPORT_DIR", DEFAULT_EXPORT_DIR))
+    parser.add_argument("--news", type=int, nargs="+", help="只重建这些文章 id")
+    parser.add_argument("--no-precompress", action="store_true", help="不生成 .gz / .br")
+    args = parser.parse_args()
+
+    exporter = StaticExporter(out_dir=args.out, precompress=not args.no_precompress)
+    if args.news:
+        categories = {item["category"] for item in map(get_news_by_id, args.news) if item}
+        exporter.rebuild(args.news, categories)
+        print(f"✅ 已重建 {len(args.news)} 篇文章及相关页面 → {args.out}")
+    else:
+        count = exporter.export_all()
+        print(f"✅ 已导出 {count} 篇文章 → {args.out}")
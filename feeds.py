@@ -0,0 +1,322 @@
+"""
+订阅源：RSS 2.0 / Atom / JSON Feed，全站和按分类各一份。
+
+- 每次新闻写入后（db.on_news_write 钩子）重新生成受影响的订阅源，平时请求不查数据库
+- 生成结果连同 .gz / .br 预压缩版本写到 FEED_DIR，同机的所有 worker 共用；
+  各 worker 按文件 mtime 缓存到内存
+- 响应带 ETag / Last-Modified，轮询方带条件请求时直接返回 304；内容没变时不重写文件，
+  Last-Modified 不会前移
+- app 和 harvest.py 都注册了写入钩子；此外超过 FEED_MAX_AGE 未检查的订阅源先返回旧内容，
+  再在后台线程里重建（兜底，例如其他写入方没有注册钩子）
+- 不存在的分类会短暂记住（FEED_MISS_TTL），重复请求不再查数据库
+"""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, formatdate, parsedate_to_datetime
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from fastapi.responses import Response
+
+from db import get_all_news_by_category
+from compression import choose_encoding, write_precompressed, remove_precompressed
+
+SITE_URL = "https://www.mychinesenews.my"
+SITE_NAME = "我报"
+
+FEED_DIR = os.environ.get("FEED_DIR", os.path.join(tempfile.gettempdir(), "mychinesenews-feeds"))
+FEED_SIZE = int(os.environ.get("FEED_SIZE", 30))
+FEED_MAX_AGE = int(os.environ.get("FEED_MAX_AGE", 3600))
+FEED_MISS_TTL = int(os.environ.get("FEED_MISS_TTL", 60))
+MAX_MISSES = 1000
+SUMMARY_LENGTH = 200
+
+# 格式 → (文件名, Content-Type)
+FORMATS = {
+    "rss": ("feed.xml", "application/rss+xml; charset=utf-8"),
+    "atom": ("atom.xml", "application/atom+xml; charset=utf-8"),
+    "json": ("feed.json", "application/feed+json; charset=utf-8"),
+}
+
+
+# -------------------- 序列化 --------------------
+def feed_path(category):
+    """订阅源自身的 URL 路径前缀：全站为空，分类为 /category/<分类>"""
+    return "" if category == "all" else f"/category/{quote(category)}"
+
+
+def feed_title(category):
+    return SITE_NAME if category == "all" else f"{SITE_NAME} - {category}"
+
+
+def summarize(content):
+    text = " ".join((content or "").split())
+    return text[:SUMMARY_LENGTH] + ("..." if len(text) > SUMMARY_LENGTH else "")
+
+
+def attr(value):
+    return escape(value or "", {'"': "&quot;"})
+
+
+def news_url(item):
+    return f"{SITE_URL}/news/{item['id']}"
+
+
+def render_rss(category, news, updated):
+    items = []
+    for item in news:
+        parts = [
+            f"<title>{escape(item['title'] or '')}</title>",
+            f"<link>{news_url(item)}</link>",
+            f'<guid isPermaLink="true">{news_url(item)}</guid>',
+            f"<category>{escape(item['category'] or '')}</category>",
+            f"<description>{escape(summarize(item['content']))}</description>",
+        ]
+        if item["created_at"]:
+            parts.append(f"<pubDate>{format_datetime(item['created_at'])}</pubDate>")
+        if item["image_url"]:
+            parts.append(f'<enclosure url="{attr(item["image_url"])}" type="image/jpeg" length="0"/>')
+        items.append("<item>" + "".join(parts) + "</item>")
+
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+<channel>
+<title>{escape(feed_title(category))}</title>
+<link>{SITE_URL}{feed_path(category) or "/"}</link>
+<description>{escape(feed_title(category))} 最新新闻</description>
+<language>zh-CN</language>
+<lastBuildDate>{format_datetime(updated)}</lastBuildDate>
+<atom:link href="{SITE_URL}{feed_path(category)}/feed.xml" rel="self" type="application/rss+xml"/>
+{chr(10).join(items)}
+</channel>
+</rss>"""
+
+
+def render_atom(category, news, updated):
+    entries = []
+    for item in news:
+        published = (item["created_at"] or updated).isoformat()
+        entries.append(
+            "<entry>"
+            f"<title>{escape(item['title'] or '')}</title>"
+            f'<link href="{news_url(item)}"/>'
+            f"<id>{news_url(item)}</id>"
+            f"<updated>{published}</updated>"
+            f"<published>{published}</published>"
+            f'<category term="{attr(item["category"])}"/>'
+            f"<summary>{escape(summarize(item['content']))}</summary>"
+            "</entry>"
+        )
+
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="zh-CN">
+<title>{escape(feed_title(category))}</title>
+<id>{SITE_URL}{feed_path(category) or "/"}</id>
+<link href="{SITE_URL}{feed_path(category) or "/"}"/>
+<link href="{SITE_URL}{feed_path(category)}/atom.xml" rel="self"/>
+<updated>{updated.isoformat()}</updated>
+<author><name>{SITE_NAME}</name></author>
+{chr(10).join(entries)}
+</feed>"""
+
+
+def render_json(category, news, updated):
+    feed = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": feed_title(category),
+        "home_page_url": f"{SITE_URL}{feed_path(category) or '/'}",
+        "feed_url": f"{SITE_URL}{feed_path(category)}/feed.json",
+        "language": "zh-CN",
+        "items": [
+            {
+                "id": str(item["id"]),
+                "url": news_url(item),
+                "title": item["title"],
+                "content_text": summarize(item["content"]),
+                "date_published": item["created_at"].isoformat() if item["created_at"] else None,
+                "image": item["image_url"],
+                "tags": [item["category"]] if item["category"] else [],
+            }
+            for item in news
+        ],
+    }
+    return json.dumps(feed, ensure_ascii=False)
+
+
+RENDERERS = {"rss": render_rss, "atom": render_atom, "json": render_json}
+
+
+# -------------------- 存储与响应 --------------------
+class Feed:
+    """一份已序列化的订阅源：原文 + 预压缩版本 + 校验信息"""
+
+    def __init__(self, body, variants, mtime):
+        self.body = body
+        self.variants = variants  # 编码 → bytes
+        self.mtime = mtime
+        digest = hashlib.sha1(body).hexdigest()[:16]
+        # 强 ETag 必须随内容编码不同而不同：原文 "<sha>"，压缩版本 "<sha>-br" / "<sha>-gzip"
+        self.etags = {None: f'"{digest}"', **{encoding: f'"{digest}-{encoding}"' for encoding in variants}}
+        self.last_modified = formatdate(mtime, usegmt=True)
+
+
+class FeedStore:
+    def __init__(self, directory=FEED_DIR, size=FEED_SIZE, max_age=FEED_MAX_AGE, miss_ttl=FEED_MISS_TTL):
+        self.directory = directory
+        self.size = size
+        self.max_age = max_age
+        self.miss_ttl = miss_ttl
+        self._cache = {}      # 文件路径 → Feed
+        self._checked = {}    # 分类 → 本进程最近一次确认内容最新的时间
+        self._misses = {}     # 分类 → 发现没有新闻的时间
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _file(self, category, fmt):
+        # 分类名直接做目录名不安全（可能含 /），用 UTF-8 十六进制
+        key = "all" if category == "all" else category.encode("utf-8").hex()
+        return os.path.join(self.directory, key, FORMATS[fmt][0])
+
+    # ---------- 生成 ----------
+    def build(self, category):
+        """查一次数据库，生成该分类的全部格式；没有新闻的分类返回 None"""
+        news = get_all_news_by_category(category, skip=0, limit=self.size)
+        if not news and category != "all":
+            return None
+        updated = max((item["created_at"] for item in news if item["created_at"]),
+                      default=datetime.now(timezone.utc))
+        return {fmt: render(category, news, updated).encode("utf-8") for fmt, render in RENDERERS.items()}
+
+    def save(self, category, rendered):
+        for fmt, body in rendered.items():
+            write_precompressed(self._file(category, fmt), body)
+
+    def remove(self, category):
+        for fmt in FORMATS:
+            remove_precompressed(self._file(category, fmt))
+
+    def refresh(self, category):
+        rendered = self.build(category)
+        if rendered is None:
+            # 分类不存在，或里面的新闻被删光了
+            self.remove(category)
+            with self._lock:
+                if len(self._misses) >= MAX_MISSES:
+                    self._misses.clear()
+                self._misses[category] = time.time()
+        else:
+            self.save(category, rendered)
+            self._misses.pop(category, None)
+        self._checked[category] = time.time()
+
+    def rebuild(self, categories=()):
+        for category in {"all", *categories}:
+            self.refresh(category)
+
+    def on_write(self, news_ids, categories):
+        """db.on_news_write 钩子（在写入钩子线程里执行）"""
+        self.rebuild(categories)
+
+    # ---------- 读取 ----------
+    def _is_miss(self, category):
+        missed_at = self._misses.get(category)
+        return missed_at is not None and time.time() - missed_at < self.miss_ttl
+
+    def _is_stale(self, category, mtime):
+        return time.time() - max(mtime, self._checked.get(category, 0)) > self.max_age
+
+    def _refresh_in_background(self, category):
+        """在线程里重建（查库 + 压缩不阻塞事件循环），同一分类同时只有一个"""
+        with self._lock:
+            if category in self._refreshing:
+                return
+            self._refreshing.add(category)
+
+        def run():
+            try:
+                self.refresh(category)
+            except Exception as e:
+                print(f"订阅源重建失败 ({category}): {e}")
+            finally:
+                self._refreshing.discard(category)
+
+        threading.Thread(target=run, name="feed-refresh", daemon=True).start()
+
+    def _load(self, path, mtime):
+        cached = self._cache.get(path)
+        if cached is not None and cached.mtime == mtime:
+            return cached
+
+        with open(path, "rb") as f:
+            body = f.read()
+        variants = {}
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if os.path.exists(path + suffix):
+                with open(path + suffix, "rb") as f:
+                    variants[encoding] = f.read()
+        feed = self._cache[path] = Feed(body, variants, mtime)
+        return feed
+
+    async def get(self, category, fmt):
+        path = self._file(category, fmt)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            mtime = None
+
+        if mtime is None:
+            if self._is_miss(category):
+                return None
+            # 首次请求某个分类：在线程里生成，不阻塞事件循环
+            await asyncio.to_thread(self.refresh, category)
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                return None
+        elif self._is_stale(category, mtime):
+            # 过期只是兜底：先返回旧内容，后台重建
+            self._refresh_in_background(category)
+
+        return self._load(path, mtime)
+
+    async def response(self, request, category, fmt):
+        feed = await self.get(category, fmt)
+        if feed is None:
+            return Response(status_code=404)
+
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""), tuple(feed.variants))
+        headers = {
+            "ETag": feed.etags[encoding],
+            "Last-Modified": feed.last_modified,
+            "Cache-Control": "public, max-age=300",
+            "Vary": "Accept-Encoding",
+        }
+        if is_not_modified(request, feed):
+            return Response(status_code=304, headers=headers)
+
+        body = feed.body
+        if encoding is not None:
+            body = feed.variants[encoding]
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=FORMATS[fmt][1], headers=headers)
+
+
+def is_not_modified(request, feed):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        # 任一编码的 ETag 都说明客户端手里的内容是最新的
+        return "*" in tags or any(etag in tags for etag in feed.etags.values())
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(feed.mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
@@ -0,0 +1,40 @@
+"""
+生产环境启动配置：gunicorn 管理多个 uvicorn worker（FastAPI 是 ASGI 应用，不能用默认的同步 worker）。
+
+    gunicorn -c gunicorn.conf.py app:app
+
+环境变量：
+    PORT             监听端口（Render 自动注入），默认 8000
+    WEB_CONCURRENCY  worker 数量；不设置时按 CPU 核数计算，最多 MAX_WORKERS 个
+    MAX_WORKERS      worker 上限，默认 4（免费 MySQL 限制 5 个连接，每个 worker 占 1 个）
+    GRACEFUL_TIMEOUT 收到 SIGTERM 后等待进行中请求完成的秒数，默认 30
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+_max_workers = int(os.environ.get("MAX_WORKERS", 4))
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count(), _max_workers)))
+
+# master 先导入 app，worker fork 后直接共享已加载的代码和模板
+preload_app = True
+
+timeout = 60
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """master 启动时执行一次：建表、生成 sitemap、预压缩静态文件"""
+    import app
+    import db
+
+    app.bootstrap()
+    # fork 之前关掉 master 的连接，避免多个 worker 共用同一个 MySQL socket
+    db.close_pool()
+    server.log.info("bootstrap 完成，开始启动 %s 个 worker", workers)
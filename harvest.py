@@ -1,6 +1,8 @@
 import requests
 from bs4 import BeautifulSoup
-from db import insert_news
+from db import insert_news, on_news_write, wait_for_write_hooks
+from export import enable_from_env as enable_static_export
+from feeds import FeedStore
 import time
 from urllib.parse import urljoin
 from deep_translator import GoogleTranslator
@@ -88,35 +90,41 @@ def fetch_article_content(link):
         return ""
     try:
         resp = requests.get(link, timeout=15)
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        if "udn.com" in link:
-            div = (
-                soup.select_one("section.article-content__editor")
-                or soup.select_one("div.article-content__editor")
-                or soup.select_one("div#article_body")
-                or soup.select_one("div#story_body_content")
-            )
-        elif "ltn.com" in link:
-            div = (
-                soup.select_one("div.text")
-                or soup.select_one("div.cont")
-                or soup.select_one("div#newsContent")
-            )
-        elif "yahoo.com" in link:
-            div = soup.select_one("article")
-        else:
-            div = None
-
-        if div:
-            paragraphs = div.find_all("p")
-            content = "\n".join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
-            return content
+        return parse_article_content(resp.text, link)
     except Exception as e:
         print(f"抓文章内容失败 ({link}): {e}")
     return ""
 
 
+def parse_article_content(html, link):
+    """从文章页 HTML 中解析正文（与网络请求分离，便于离线基准测试）"""
+    soup = BeautifulSoup(html, "html.parser")
+
+    if "udn.com" in link:
+        div = (
+            soup.select_one("section.article-content__editor")
+            or soup.select_one("div.article-content__editor")
+            or soup.select_one("div#article_body")
+            or soup.select_one("div#story_body_content")
+        )
+    elif "ltn.com" in link:
+        div = (
+            soup.select_one("div.text")
+            or soup.select_one("div.cont")
+            or soup.select_one("div#newsContent")
+        )
+    elif "yahoo.com" in link:
+        div = soup.select_one("article")
+    else:
+        div = None
+
+    if div:
+        paragraphs = div.find_all("p")
+        content = "\n".join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
+        return content
+    return ""
+
+
 # --------------------------
 # 抓取文章图片
 # --------------------------
@@ -125,40 +133,45 @@ def fetch_article_image(link):
         return None
     try:
         resp = requests.get(link, timeout=15)
-        soup = BeautifulSoup(resp.text, "html.parser")
-        img_url = None
-
-        if "udn.com" in link:
-            meta = soup.select_one('meta[property="og:image"]') or soup.select_one('meta[name="twitter:image"]')
-            if meta:
-                img_url = meta.get("content")
-            if not img_url:
-                div = (
-                    soup.select_one("div#story_body_content")
-                    or soup.select_one("section.article-content__editor")
-                )
-                if div:
-                    img = div.find("img")
-                    if img:
-                        img_url = img.get("data-src") or img.get("src")
-        elif "ltn.com" in link:
-            div = soup.select_one("div.text")
+        return parse_article_image(resp.text, link)
+    except Exception as e:
+        print(f"抓文章图片失败 ({link}): {e}")
+    return None
+
+
+def parse_article_image(html, link):
+    """从文章页 HTML 中解析封面图 URL"""
+    soup = BeautifulSoup(html, "html.parser")
+    img_url = None
+
+    if "udn.com" in link:
+        meta = soup.select_one('meta[property="og:image"]') or soup.select_one('meta[name="twitter:image"]')
+        if meta:
+            img_url = meta.get("content")
+        if not img_url:
+            div = (
+                soup.select_one("div#story_body_content")
+                or soup.select_one("section.article-content__editor")
+            )
             if div:
                 img = div.find("img")
                 if img:
-                    img_url = img.get("src")
-        elif "yahoo.com" in link:
-            meta = soup.select_one('meta[property="og:image"]')
-            if meta:
-                img_url = meta.get("content")
+                    img_url = img.get("data-src") or img.get("src")
+    elif "ltn.com" in link:
+        div = soup.select_one("div.text")
+        if div:
+            img = div.find("img")
+            if img:
+                img_url = img.get("src")
+    elif "yahoo.com" in link:
+        meta = soup.select_one('meta[property="og:image"]')
+        if meta:
+            img_url = meta.get("content")
 
-        if img_url and img_url.startswith("/"):
-            img_url = urljoin(link, img_url)
+    if img_url and img_url.startswith("/"):
+        img_url = urljoin(link, img_url)
 
-        return img_url
-    except Exception as e:
-        print(f"抓文章图片失败 ({link}): {e}")
-    return None
+    return img_url
 
 
 # --------------------------
@@ -212,7 +225,23 @@ def fetch_site_news(url, limit=20):
 # --------------------------
 # 主入口：抓新闻 + 改写 + 入库
 # --------------------------
+_write_hooks_enabled = False
+WRITE_HOOKS_TIMEOUT = 120
+
+def enable_write_hooks():
+    """
+    harvest 在独立进程里写入，不经过 app，需要自己注册写入钩子，
+    否则静态导出的页面和订阅源不会出现新抓到的文章
+    """
+    global _write_hooks_enabled
+    if not _write_hooks_enabled:
+        enable_static_export()
+        on_news_write(FeedStore().on_write)
+        _write_hooks_enabled = True
+
+
 def fetch_news():
+    enable_write_hooks()
     all_news = []
     sites = [
         "https://udn.com/news/index",
@@ -274,6 +303,9 @@ def fetch_news():
                 print(f"❌ 插入失败: {title[:30]}... 错误: {e}")
 
     print(f"\n📊 本次共成功保存 {len(all_news)} 条新闻")
+    # 调用方可能随后退出进程，等静态页 / 订阅源重建完成；钩子卡住时不能让抓取一直挂着
+    if not wait_for_write_hooks(WRITE_HOOKS_TIMEOUT):
+        print(f"⚠️ 等待静态页 / 订阅源重建超过 {WRITE_HOOKS_TIMEOUT} 秒，不再等待（进程退出时未完成的重建会丢失）")
     return all_news
 
 
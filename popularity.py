@@ -0,0 +1,149 @@
+"""
+阅读量与“热门”排行（write-behind）。
+
+- 文章页只在内存里给计数器 +1，不产生任何数据库请求
+- 计数按 news_id 分片、按小时分桶缓冲，每 FLUSH_INTERVAL 秒用一条多行 upsert 写入 news_stats
+- 每 REFRESH_INTERVAL 秒读取最近 WINDOW_HOURS 小时的分桶，按半衰期衰减计算热度，
+  缓存每个分类的前 N 名供首页 / 分类页使用
+- 每个 worker 各自计数、各自刷写（累加语义，互不覆盖）
+
+环境变量：
+    POPULARITY_FLUSH_INTERVAL    刷写间隔（秒），默认 30
+    POPULARITY_REFRESH_INTERVAL  热门榜刷新间隔（秒），默认 300
+    POPULARITY_HALF_LIFE_HOURS   热度半衰期（小时），默认 6
+"""
+import asyncio
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from db import add_news_views, get_recent_views
+
+FLUSH_INTERVAL = int(os.environ.get("POPULARITY_FLUSH_INTERVAL", 30))
+REFRESH_INTERVAL = int(os.environ.get("POPULARITY_REFRESH_INTERVAL", 300))
+HALF_LIFE_HOURS = float(os.environ.get("POPULARITY_HALF_LIFE_HOURS", 6))
+WINDOW_HOURS = 72
+TOP_N = 10
+
+
+def current_bucket():
+    """按小时截断的 UTC 时间，作为 news_stats.bucket"""
+    return datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+
+
+# -------------------- 分片计数器 --------------------
+class ShardedCounter:
+    """按 key 分片加锁的计数器；drain() 一次性取走全部计数"""
+
+    def __init__(self, shards=16):
+        self._shards = [defaultdict(int) for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def _index(self, key):
+        return hash(key) % len(self._shards)
+
+    def add(self, key, n=1):
+        i = self._index(key)
+        with self._locks[i]:
+            self._shards[i][key] += n
+
+    def drain(self):
+        merged = {}
+        for i, lock in enumerate(self._locks):
+            with lock:
+                shard, self._shards[i] = self._shards[i], defaultdict(int)
+            merged.update(shard)  # 不同分片的 key 不会重复
+        return merged
+
+    def merge(self, counts):
+        """刷写失败时把取走的计数放回去，下次再写"""
+        for key, n in counts.items():
+            self.add(key, n)
+
+
+# -------------------- 热门排行 --------------------
+def decayed_score(views, bucket, now, half_life_hours=HALF_LIFE_HOURS):
+    """按分桶中点到现在的时间做指数衰减，半衰期 half_life_hours"""
+    age_hours = max((now - bucket).total_seconds() / 3600 - 0.5, 0)
+    return views * 0.5 ** (age_hours / half_life_hours)
+
+
+def rank(rows, now, top_n=TOP_N, half_life_hours=HALF_LIFE_HOURS):
+    """rows 来自 get_recent_views；返回 {分类: [新闻, ...]}，另含 "all" 全站榜"""
+    articles = {}
+    for row in rows:
+        item = articles.setdefault(row["id"], {
+            "id": row["id"],
+            "title": row["title"],
+            "image_url": row["image_url"],
+            "category": row["category"],
+            "views": 0,
+            "score": 0.0,
+        })
+        item["views"] += row["views"]
+        item["score"] += decayed_score(row["views"], row["bucket"], now, half_life_hours)
+
+    ranked = sorted(articles.values(), key=lambda item: item["score"], reverse=True)
+    top = {"all": ranked[:top_n]}
+    for item in ranked:
+        if item["category"] == "all":
+            continue  # 默认分类 "all" 的文章已在全站榜里，不能再追加一次
+        bucket = top.setdefault(item["category"], [])
+        if len(bucket) < top_n:
+            bucket.append(item)
+    return top
+
+
+class PopularityTracker:
+    def __init__(self, flush_interval=FLUSH_INTERVAL, refresh_interval=REFRESH_INTERVAL,
+                 half_life_hours=HALF_LIFE_HOURS, top_n=TOP_N):
+        self.flush_interval = flush_interval
+        self.refresh_interval = refresh_interval
+        self.half_life_hours = half_life_hours
+        self.top_n = top_n
+        self.counter = ShardedCounter()
+        self._top = {}
+
+    # ---------- 请求路径（纯内存） ----------
+    def record_view(self, news_id):
+        self.counter.add((news_id, current_bucket()))
+
+    def top(self, category="all", n=None):
+        return self._top.get(category, [])[:n or self.top_n]
+
+    # ---------- 后台 ----------
+    def flush(self):
+        counts = self.counter.drain()
+        if not counts:
+            return 0
+        rows = [(news_id, bucket, views) for (news_id, bucket), views in counts.items()]
+        try:
+            add_news_views(rows)
+        except Exception as e:
+            self.counter.merge(counts)
+            print(f"阅读量刷写失败，稍后重试: {e}")
+            return 0
+        return len(rows)
+
+    def refresh(self):
+        now = datetime.utcnow()
+        rows = get_recent_views(now - timedelta(hours=WINDOW_HOURS))
+        self._top = rank(rows, now, self.top_n, self.half_life_hours)
+
+    async def run(self):
+        """
+        后台任务：定期刷写计数、刷新热门榜。
+        数据库读写和排序放到线程里执行，不阻塞事件循环；连接池由 db.execute 的锁串行化。
+        """
+        since_refresh = 0
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await asyncio.to_thread(self.flush)
+            since_refresh += self.flush_interval
+            if since_refresh >= self.refresh_interval:
+                since_refresh = 0
+                try:
+                    await asyncio.to_thread(self.refresh)
+                except Exception as e:
+                    print(f"热门榜刷新失败: {e}")
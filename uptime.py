@@ -0,0 +1,238 @@
+"""
+在线监控：并发探测 UPTIME_TARGETS，记录每个目标的延迟 / 可用率历史，取代原来串行的 keep-alive。
+
+- 所有目标共用一个 httpx.AsyncClient（连接池），每个目标独立超时，失败后指数退避
+- 同一台机器上的多个 worker 只有一个在探测（文件锁选主）；主 worker 把结果写到
+  状态文件，其他 worker 读取它来响应 /api/uptime；主 worker 退出后由其他 worker 接替
+
+环境变量：
+    UPTIME_TARGETS   逗号分隔的 URL，可用 "url|超时秒数" 单独指定超时；设为空字符串则不探测
+    UPTIME_INTERVAL  正常探测间隔（秒），默认 300
+    UPTIME_TIMEOUT   默认超时（秒），默认 10
+    UPTIME_HISTORY   每个目标保留的历史记录条数，默认 288（5 分钟一次即 24 小时）
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+
+import httpx
+
+from compression import write_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows 本地开发：没有文件锁，每个进程都当主
+    fcntl = None
+
+DEFAULT_TARGETS = [
+    "https://globalinternationalnews.onrender.com/",
+    "https://globalnews-5ose.onrender.com/",
+    "https://www.mychinesenews.my",
+    "https://allmychinesenews.onrender.com/",
+]
+
+STATE_DIR = tempfile.gettempdir()
+LOCK_PATH = os.path.join(STATE_DIR, "mychinesenews-uptime.lock")
+STATE_PATH = os.path.join(STATE_DIR, "mychinesenews-uptime.json")
+
+# 非主 worker 每隔多久尝试接替一次
+LEADER_RETRY_SECONDS = 30
+
+
+# -------------------- 配置 --------------------
+def parse_targets(value, default_timeout):
+    """'https://a/|5, https://b/' → [('https://a/', 5.0), ('https://b/', default_timeout)]"""
+    targets = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        url, _, timeout = item.partition("|")
+        targets.append((url.strip(), float(timeout) if timeout else default_timeout))
+    return targets
+
+
+def targets_from_env():
+    timeout = float(os.environ.get("UPTIME_TIMEOUT", 10))
+    value = os.environ.get("UPTIME_TARGETS")
+    if value is None:
+        return [(url, timeout) for url in DEFAULT_TARGETS]
+    return parse_targets(value, timeout)
+
+
+# -------------------- 单个目标 --------------------
+class Target:
+    def __init__(self, url, timeout, history_size):
+        self.url = url
+        self.timeout = timeout
+        self.history = deque(maxlen=history_size)  # (时间戳, 是否成功, 延迟毫秒)
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_status = None
+
+    def record(self, ok, latency_ms, status=None, error=None):
+        self.history.append((int(time.time()), ok, round(latency_ms, 1)))
+        self.last_status = status
+        self.last_error = error
+        self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+
+    def next_delay(self, interval, max_backoff):
+        """成功按固定间隔；连续失败按 interval * 2^n 退避，加一点抖动避免扎堆"""
+        if self.consecutive_failures == 0:
+            delay = interval
+        else:
+            delay = min(interval * 2 ** self.consecutive_failures, max_backoff)
+        return delay + random.uniform(0, delay * 0.1)
+
+    def summary(self):
+        checks = len(self.history)
+        latencies = sorted(h[2] for h in self.history if h[1])
+        return {
+            "url": self.url,
+            "timeout": self.timeout,
+            "up": bool(self.history) and self.history[-1][1],
+            "checks": checks,
+            "availability": round(sum(1 for h in self.history if h[1]) / checks, 4) if checks else None,
+            "latency_ms": {
+                "last": self.history[-1][2] if checks else None,
+                "p50": statistics.median(latencies) if latencies else None,
+                "p95": latencies[math.ceil(0.95 * len(latencies)) - 1] if latencies else None,
+            },
+            "consecutive_failures": self.consecutive_failures,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+            "history": [list(h) for h in self.history],
+        }
+
+
+# -------------------- 监控器 --------------------
+class UptimeMonitor:
+    def __init__(self, targets, interval=300, history_size=288, max_backoff=3600,
+                 lock_path=LOCK_PATH, state_path=STATE_PATH):
+        self.targets = [Target(url, timeout, history_size) for url, timeout in targets]
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.lock_path = lock_path
+        self.state_path = state_path
+        self.is_leader = False
+        self._lock_file = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            targets_from_env(),
+            interval=int(os.environ.get("UPTIME_INTERVAL", 300)),
+            history_size=int(os.environ.get("UPTIME_HISTORY", 288)),
+        )
+
+    # ---------- 选主 ----------
+    def _try_acquire_leadership(self):
+        if fcntl is None:
+            return True
+        f = open(self.lock_path, "w")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._lock_file = f  # 保持打开；进程退出时内核自动释放
+        return True
+
+    def _release_leadership(self):
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        self.is_leader = False
+
+    # ---------- 运行 ----------
+    async def run(self):
+        """后台任务入口：拿到锁就开始探测，否则定期重试接替"""
+        if not self.targets:
+            return
+        try:
+            while True:
+                if self._try_acquire_leadership():
+                    self.is_leader = True
+                    self._load_state()
+                    print(f"[{datetime.now()}] uptime 监控启动（pid={os.getpid()}，{len(self.targets)} 个目标）")
+                    await self._monitor()
+                await asyncio.sleep(LEADER_RETRY_SECONDS)
+        finally:
+            self._release_leadership()
+
+    async def _monitor(self):
+        limits = httpx.Limits(max_connections=len(self.targets), max_keepalive_connections=len(self.targets))
+        async with httpx.AsyncClient(limits=limits, follow_redirects=True) as client:
+            await asyncio.gather(*(self._probe_loop(client, t) for t in self.targets))
+
+    async def _probe_loop(self, client, target):
+        while True:
+            await self.probe(client, target)
+            await asyncio.sleep(target.next_delay(self.interval, self.max_backoff))
+
+    async def probe(self, client, target):
+        start = time.perf_counter()
+        try:
+            resp = await client.get(target.url, timeout=target.timeout)
+            latency_ms = (time.perf_counter() - start) * 1000
+            ok = resp.status_code < 500
+            target.record(ok, latency_ms, status=resp.status_code,
+                          error=None if ok else f"HTTP {resp.status_code}")
+        except Exception as e:
+            latency_ms = (time.perf_counter() - start) * 1000
+            ok = False
+            target.record(False, latency_ms, error=f"{type(e).__name__}: {e}")
+
+        if ok:
+            print(f"[{datetime.now()}] keep-alive 成功: {target.url} ({latency_ms:.0f}ms)")
+        else:
+            print(f"[{datetime.now()}] keep-alive 失败: {target.url} 错误: {target.last_error}")
+        try:
+            self._save_state()
+        except OSError as e:
+            print(f"写入 uptime 状态失败: {e}")
+
+    # ---------- 状态 ----------
+    def _snapshot(self):
+        return {
+            "leader_pid": os.getpid() if self.is_leader else None,
+            "interval": self.interval,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+            "targets": [t.summary() for t in self.targets],
+        }
+
+    def _save_state(self):
+        write_atomic(self.state_path, json.dumps(self._snapshot(), ensure_ascii=False).encode("utf-8"))
+
+    def _load_state(self):
+        """接替主 worker 时从状态文件恢复历史，重启 / 部署后不丢失滚动的可用率和延迟数据"""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                saved = {t["url"]: t for t in json.load(f).get("targets", [])}
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        for target in self.targets:
+            state = saved.get(target.url)
+            if not state or target.history:
+                continue
+            target.history.extend(tuple(h) for h in state.get("history", []))
+            target.consecutive_failures = state.get("consecutive_failures", 0)
+            target.last_status = state.get("last_status")
+            target.last_error = state.get("last_error")
+
+    def snapshot(self):
+        """主 worker 直接返回内存数据，其他 worker 读主 worker 写的状态文件"""
+        if self.is_leader or not self.targets:
+            return self._snapshot()
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return self._snapshot()